@@ -6,10 +6,11 @@ This script demonstrates the key insights from the memory traffic simulator
 with explanatory text and visualizations.
 """
 
-from memory_traffic_simulator import simulate_matrix_mult, run_simulation, run_size_comparison
 import numpy as np
 import matplotlib.pyplot as plt
 
+from memory_traffic_simulator import make_simulator, simulate_all, run_simulation, run_size_comparison
+
 def demonstrate_memory_wall():
     """Demonstrate the memory wall problem with clear examples."""
     print("🧠 MEMORY WALL DEMONSTRATION")
@@ -20,23 +21,16 @@ def demonstrate_memory_wall():
     print("• Cache efficiency is critical for performance")
     print("• Specialized architectures are needed for AI workloads\n")
     
-    sizes = [128, 256, 512]
+    sizes = np.array([128, 256, 512], dtype=np.int64)
+    
+    # Calculate energies for all sizes, then convert to microjoules once
+    energies_uj = np.array(simulate_all(sizes)) * 1e6
     
-    for size in sizes:
+    for size, compute_uj, memory_cache_uj, memory_no_cache_uj in zip(sizes, *energies_uj):
         print(f"📊 Matrix Size: {size}x{size}")
-        
-        # Calculate energies
-        compute_with_cache, memory_with_cache = simulate_matrix_mult(size, cache_reuse=True)
-        compute_no_cache, memory_no_cache = simulate_matrix_mult(size, cache_reuse=False)
-        
-        # Convert to more readable units (microjoules)
-        compute_uj = compute_with_cache * 1e6
-        memory_cache_uj = memory_with_cache * 1e6
-        memory_no_cache_uj = memory_no_cache * 1e6
-        
         print(f"  Compute Energy:        {compute_uj:8.2f} µJ")
-        print(f"  Memory (with cache):   {memory_cache_uj:8.2f} µJ ({memory_with_cache/compute_with_cache:.1f}x compute)")
-        print(f"  Memory (no cache):     {memory_no_cache_uj:8.2f} µJ ({memory_no_cache/compute_no_cache:.1f}x compute)")
+        print(f"  Memory (with cache):   {memory_cache_uj:8.2f} µJ ({memory_cache_uj/compute_uj:.1f}x compute)")
+        print(f"  Memory (no cache):     {memory_no_cache_uj:8.2f} µJ ({memory_no_cache_uj/compute_uj:.1f}x compute)")
         print(f"  Cache Benefit:         {memory_no_cache_uj/memory_cache_uj:.1f}x energy reduction")
         print()
 
@@ -47,26 +41,24 @@ def analyze_scaling_behavior():
     print("\nHow does energy consumption change as we increase matrix size?")
     print("This helps us understand the computational complexity impact.\n")
     
-    sizes = np.array([64, 128, 256, 512, 1024])
-    compute_energies = []
-    memory_energies = []
-    
-    for size in sizes:
-        comp, mem = simulate_matrix_mult(size, cache_reuse=True)
-        compute_energies.append(comp * 1e6)  # Convert to µJ
-        memory_energies.append(mem * 1e6)
+    sizes = np.array([64, 128, 256, 512, 1024], dtype=np.int64)
+    comp, mem, _ = simulate_all(sizes)
+    compute_energies = comp * 1e6  # Convert to µJ
+    memory_energies = mem * 1e6
     
     # Theoretical scaling (O(n^3) for compute, O(n^2) for memory)
     base_size = sizes[0]
     theoretical_compute = compute_energies[0] * (sizes / base_size) ** 3
     theoretical_memory = memory_energies[0] * (sizes / base_size) ** 2
     
+    # Totals and ratios for every size at once
+    total = compute_energies + memory_energies
+    ratio = memory_energies / compute_energies
+    
     print("Size    | Compute (µJ) | Memory (µJ) | Total (µJ) | Memory/Compute")
     print("-" * 70)
-    for i, size in enumerate(sizes):
-        total = compute_energies[i] + memory_energies[i]
-        ratio = memory_energies[i] / compute_energies[i]
-        print(f"{size:4d}    | {compute_energies[i]:10.2f} | {memory_energies[i]:9.2f} | {total:8.2f} | {ratio:8.1f}x")
+    print("\n".join(f"{s:4d}    | {c:10.2f} | {m:9.2f} | {t:8.2f} | {r:8.1f}x"
+                    for s, c, m, t, r in zip(sizes, compute_energies, memory_energies, total, ratio)))
     
     print(f"\n📋 Key Insights:")
     print(f"• Compute energy scales as O(n³) - matrix multiplication complexity")
@@ -81,30 +73,25 @@ def compare_architectures():
     print("\nHow do different memory architectures affect energy consumption?")
     print("Comparing CPU-like vs GPU-like vs specialized AI accelerator memory systems.\n")
     
-    # Different architecture assumptions
-    architectures = {
-        'CPU-like': {'sram_ratio': 0.5, 'dram_energy': 100e-12, 'sram_energy': 10e-12},
-        'GPU-like': {'sram_ratio': 0.8, 'dram_energy': 80e-12, 'sram_energy': 8e-12}, 
-        'AI Accelerator': {'sram_ratio': 0.95, 'dram_energy': 60e-12, 'sram_energy': 5e-12}
-    }
+    # Different architecture assumptions, one entry per architecture
+    arch_names = ['CPU-like', 'GPU-like', 'AI Accelerator']
+    sram_ratio = np.array([0.5, 0.8, 0.95])
+    dram_energy = np.array([100e-12, 80e-12, 60e-12])
+    sram_energy = np.array([10e-12, 8e-12, 5e-12])
     
     matrix_size = 256
     
     print(f"Architecture     | Memory Energy (µJ) | Energy Efficiency")
     print("-" * 55)
     
-    for arch_name, params in architectures.items():
-        # Calculate memory energy with architecture-specific parameters
-        reads_total = 2 * matrix_size ** 2
-        reads_sram = params['sram_ratio'] * reads_total
-        reads_dram = (1 - params['sram_ratio']) * reads_total
-        
-        memory_energy = (reads_sram * params['sram_energy'] + 
-                        reads_dram * params['dram_energy']) * 1e6  # Convert to µJ
-        
-        efficiency = architectures['CPU-like']['dram_energy'] / params['dram_energy']
-        
-        print(f"{arch_name:<15} | {memory_energy:13.2f} | {efficiency:8.1f}x")
+    # Calculate memory energy for all architectures at once
+    simulate_reuse, _ = make_simulator(sram_ratio, sram_energy, dram_energy)
+    _, memory_energy = simulate_reuse(matrix_size)
+    memory_energy = memory_energy * 1e6  # Convert to µJ
+    efficiency = dram_energy[0] / dram_energy  # relative to CPU-like
+    
+    for arch_name, mem, eff in zip(arch_names, memory_energy, efficiency):
+        print(f"{arch_name:<15} | {mem:13.2f} | {eff:8.1f}x")
     
     print(f"\n💡 Takeaway: Specialized AI chips achieve efficiency through:")
     print(f"• Higher cache hit rates (better data reuse)")
@@ -128,5 +115,5 @@ if __name__ == "__main__":
     print("• Algorithm optimizations (tiling, quantization, sparsity)")
     print("• Co-design of hardware and software for energy efficiency")
     
-    print(f"\nRun the main simulator for interactive visualizations:")
+    print(f"\nRun the main simulator to generate the PNG charts:")
     print(f"python memory_traffic_simulator.py")
\ No newline at end of file